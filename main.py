@@ -4,19 +4,52 @@ GPX Routes Workbench - A Flet app for processing iPhone Health exported GPX rout
 """
 
 import flet as ft
+import bisect
+import hashlib
 import logging
 import json
+import math
+import multiprocessing
 import os
+import re
 import shutil
+from array import array
+from collections import OrderedDict
+import threading
 import zipfile
 import webbrowser
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
+from functools import lru_cache, partial
+from itertools import compress, cycle, repeat
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Set
+from xml.etree import ElementTree as ET
 import gpxpy
 import gpxpy.gpx
-import requests
+import gpxpy.geo
+import gpxpy.gpxfield
+import numpy as np
+
+try:
+    from lxml import etree as xml_etree
+    # lxml filters events in C, so only track points and segments reach the Python loop
+    _ITERPARSE_KWARGS = {'tag': ('{*}trkpt', '{*}trkseg')}
+except ImportError:  # lxml is optional; the stdlib parser streams the same way, just slower
+    from xml.etree import ElementTree as xml_etree
+    _ITERPARSE_KWARGS = {}
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module is used without it
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy implementation is used without it
+    njit = None
 
 
 # Configure logging
@@ -31,29 +64,221 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _local_name(tag) -> str:
+    """Strip the namespace from an XML tag (comments and processing instructions have no name)"""
+    return tag.rpartition('}')[2] if isinstance(tag, str) else ''
+
+
+def _point_has_extension(point, tag_fragment: str) -> bool:
+    """Whether any of a gpxpy trackpoint's extension elements has tag_fragment in its tag"""
+    return any(tag_fragment in getattr(ext, 'tag', '') for ext in point.extensions or ())
+
+
+# activity_YYYY-MM-DD_H.MMam/pm.gpx (new format) or route_YYYY-MM-DD_H.MMam/pm.gpx (old format)
+_FILENAME_DATE_RE = re.compile(r'\w+_(\d{4})-(\d{2})-(\d{2})_(\d{1,2})\.(\d{2})(am|pm)\.gpx')
+
+# export.zip, export 2.zip, export 3.zip, etc. as saved to Downloads by repeated Health exports
+_EXPORT_ZIP_RE = re.compile(r'^export(?: (\d+))?\.zip$', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def _parse_filename_date(filename: str) -> Optional[datetime]:
+    """Datetime encoded in a route filename, or None if the name does not follow the pattern
+    Memoized: the file list sorts by this on every refresh."""
+    match = _FILENAME_DATE_RE.match(filename)
+    if not match:
+        return None
+    try:
+        year, month, day, hour, minute, period = match.groups()
+        # Convert 12-hour to 24-hour format (12am -> 0, 12pm -> 12)
+        hour = int(hour) % 12 + (12 if period == 'pm' else 0)
+        return datetime(int(year), int(month), int(day), hour, int(minute))
+    except ValueError as e:
+        logger.warning(f"Could not parse date from filename {filename}: {e}")
+        return None
+
+
+def _release_element(elem):
+    """Free a fully processed element during iterparse
+    With lxml the already-cleared preceding siblings are detached too, so the tree stays small."""
+    elem.clear()
+    if hasattr(elem, 'getprevious'):
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def _parse_timestamp(text: str) -> float:
+    """Epoch seconds for a GPX time string
+    datetime.fromisoformat covers the common forms; anything else goes through gpxpy's parser."""
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return gpxpy.gpxfield.parse_time(text).timestamp()
+
+
+def _distance_speed_kernel(lat, lon, ele, times, distances, speeds):
+    """Fill distances (meters) and speeds (m/s) between consecutive points in a single pass
+    NaN elevations fall back to 2D distance; NaN or non-positive time differences give NaN speed."""
+    lat0 = math.radians(lat[0])
+    cos_lat0 = math.cos(lat0)
+    for i in range(1, lat.shape[0]):
+        # Radians and cosine of each latitude are computed once and carried to the next pair
+        lat1 = math.radians(lat[i])
+        cos_lat1 = math.cos(lat1)
+        sin_dlat = math.sin((lat1 - lat0) / 2)
+        sin_dlon = math.sin(math.radians(lon[i] - lon[i - 1]) / 2)
+        a = sin_dlat * sin_dlat + cos_lat0 * cos_lat1 * sin_dlon * sin_dlon
+        lat0 = lat1
+        cos_lat0 = cos_lat1
+        distance_2d = 2 * gpxpy.geo.EARTH_RADIUS * math.asin(math.sqrt(min(a, 1.0)))
+        elevation_diff = ele[i] - ele[i - 1]
+        if math.isnan(elevation_diff):
+            elevation_diff = 0.0
+        distance = math.hypot(distance_2d, elevation_diff)
+        distances[i - 1] = distance
+        time_diff = times[i] - times[i - 1]
+        speeds[i - 1] = distance / time_diff if time_diff > 0 else math.nan
+
+
+def _rdp_keep_mask(lat, lon, tolerance):
+    """Ramer-Douglas-Peucker: mask of the points needed to stay within tolerance (degrees) of the line
+    The first and last points are always kept."""
+    count = lat.shape[0]
+    keep = np.zeros(count, dtype=np.bool_)
+    if count == 0:
+        return keep
+    keep[0] = True
+    keep[count - 1] = True
+    stack = [(0, count - 1)]
+    while len(stack) > 0:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        chord_lat = lat[end] - lat[start]
+        chord_lon = lon[end] - lon[start]
+        offset_lat = lat[start + 1:end] - lat[start]
+        offset_lon = lon[start + 1:end] - lon[start]
+        chord_length = np.hypot(chord_lat, chord_lon)
+        if chord_length > 0:
+            distances = np.abs(chord_lat * offset_lon - chord_lon * offset_lat) / chord_length
+        else:
+            distances = np.hypot(offset_lat, offset_lon)
+        index = np.argmax(distances)
+        if distances[index] > tolerance:
+            split = start + 1 + index
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+
+if njit is not None:
+    _rdp_keep_mask = njit(cache=True)(_rdp_keep_mask)
+
+
+# Map polylines are simplified to within this many degrees (about 1 m) of the recorded track
+_MAP_SIMPLIFY_TOLERANCE = 1e-5
+
+# Points per tile in the NumPy haversine; keeps each tile's temporaries within L2 cache
+_HAVERSINE_TILE = 16384
+
+# Characters of serialized XML encoded and written at a time in save_gpx
+_XML_WRITE_CHARS = 1 << 20
+
+# Each worker process re-imports the app (about 0.7 s), so smaller batches are parsed inline.
+# The array parser reads roughly 17 MB/s, gpxpy parse-and-rewrite roughly 2 MB/s.
+_PARALLEL_PARSE_MIN_BYTES = 16 << 20
+_PARALLEL_REWRITE_MIN_BYTES = 2 << 20
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+
+def _map_files(func: Callable, file_paths: List[str], min_bytes: int):
+    """Yield func(path) for each file, in completion order
+    Batches under min_bytes run inline; larger ones share one long-lived process pool, capped
+    at one worker per file and per CPU and only recreated when a bigger batch needs more.
+    If a worker dies, the pool is discarded and the files not yet finished are run inline."""
+    global _process_pool, _process_pool_workers
+    workers = min(len(file_paths), os.cpu_count() or 1)
+    if workers < 2 or sum(os.path.getsize(path) for path in file_paths if os.path.exists(path)) < min_bytes:
+        for path in file_paths:
+            yield func(path)
+        return
+    
+    pool = None
+    futures = {}
+    finished = set()
+    try:
+        with _process_pool_lock:
+            if _process_pool_workers < workers:
+                if _process_pool is not None:
+                    # Work already queued on the old pool still runs to completion
+                    _process_pool.shutdown(wait=False)
+                # Spawned workers start clean; forking would copy this process's threads and held locks
+                _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                _process_pool_workers = workers
+            pool = _process_pool
+            for path in file_paths:
+                futures[pool.submit(func, path)] = path
+        for future in as_completed(futures):
+            result = future.result()
+            finished.add(futures[future])
+            yield result
+    except BrokenProcessPool as e:
+        logger.warning(f"Worker process pool failed ({e}); finishing {len(file_paths) - len(finished)} file(s) inline")
+        with _process_pool_lock:
+            if _process_pool is pool:
+                _process_pool = None
+                _process_pool_workers = 0
+        for path in file_paths:
+            if path not in finished:
+                yield func(path)
+
+
+if njit is not None:
+    # fastmath without 'nnan'/'ninf': NaN marks missing elevations and timestamps
+    _distance_speed_kernel = njit(cache=True, fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'})(_distance_speed_kernel)
+
+
 class PersistentData:
     """Manages persistent application data"""
     
     def __init__(self, data_file: str = "app_data.json"):
         self.data_file = data_file
         self.data = self.load()
+        self._saved_payload = None
     
     def load(self) -> Dict:
         """Load data from JSON file"""
         if os.path.exists(self.data_file):
             try:
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
+                with open(self.data_file, 'rb') as f:
+                    raw = f.read()
+                return orjson.loads(raw) if orjson is not None else json.loads(raw)
             except Exception as e:
                 logger.error(f"Error loading data: {e}")
                 return self._get_default_data()
         return self._get_default_data()
     
     def save(self):
-        """Save data to JSON file"""
+        """Save data to JSON file
+        The write is skipped when the data is unchanged since the last save. The file is replaced
+        atomically, so a crash mid-write leaves the previous settings intact."""
         try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
+            if orjson is not None:
+                payload = orjson.dumps(self.data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(self.data, indent=2).encode()
+            if payload == self._saved_payload and os.path.exists(self.data_file):
+                return
+            tmp_file = f"{self.data_file}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_file, self.data_file)
+            self._saved_payload = payload
             logger.info("Data saved successfully")
         except Exception as e:
             logger.error(f"Error saving data: {e}")
@@ -71,6 +296,13 @@ class PersistentData:
 class GPXProcessor:
     """Handles GPX file processing operations"""
     
+    # get_gpx_arrays results by path: (mtime_ns, size) key and arrays, least recently used first
+    _array_memo: "OrderedDict[str, tuple]" = OrderedDict()
+    _array_memo_capacity = 64
+    _array_memo_lock = threading.Lock()
+    # get_file_max_speed_and_distance results by path: (mtime_ns, size) key and the two values
+    _speed_summaries: Dict[str, tuple] = {}
+    
     @staticmethod
     def parse_gpx(file_path: str, auto_add_speed: bool = False) -> Optional[gpxpy.gpx.GPX]:
         """Parse a GPX file and optionally add speed tags automatically"""
@@ -92,38 +324,229 @@ class GPXProcessor:
             logger.error(f"Error parsing GPX file {file_path}: {e}")
             return None
     
+    @staticmethod
+    def parse_gpx_arrays(file_path: str) -> Optional[Dict[str, np.ndarray]]:
+        """Stream trackpoints from a GPX file into NumPy arrays without building a gpxpy object tree
+        Returns a dict with per-point 'lat', 'lon', 'time' (epoch seconds) float64 arrays and 'ele',
+        'speed', 'distance' (distance-to-next) float32 arrays, NaN where missing, plus 'segment_ends' offsets."""
+        lat, lon, ele, times = array('d'), array('d'), array('d'), array('d')
+        speed, distance = array('d'), array('d')
+        segment_ends = []
+        # Bound once: these are called for every trackpoint
+        nan, isnan = math.nan, math.isnan
+        lat_append, lon_append, ele_append = lat.append, lon.append, ele.append
+        time_append, speed_append, distance_append = times.append, speed.append, distance.append
+        
+        try:
+            with open(file_path, 'rb') as gpx_file:
+                for _, elem in xml_etree.iterparse(gpx_file, events=('end',), **_ITERPARSE_KWARGS):
+                    tag = _local_name(elem.tag)
+                    if tag == 'trkseg':
+                        segment_ends.append(len(lat))
+                        _release_element(elem)
+                        continue
+                    if tag != 'trkpt':
+                        continue
+                    
+                    lat_append(float(elem.get('lat')))
+                    lon_append(float(elem.get('lon')))
+                    point_ele = point_time = point_speed = point_distance = nan
+                    for child in elem:
+                        child_tag = _local_name(child.tag)
+                        if child_tag == 'ele' and child.text:
+                            point_ele = float(child.text)
+                        elif child_tag == 'time' and child.text:
+                            point_time = _parse_timestamp(child.text.strip())
+                        elif child_tag == 'speed' and child.text:
+                            point_speed = float(child.text)
+                        elif child_tag == 'extensions':
+                            for ext in child:
+                                ext_tag = _local_name(ext.tag)
+                                try:
+                                    if 'distance-to-next' in ext_tag:
+                                        point_distance = float(ext.text)
+                                    elif 'speed' in ext_tag and isnan(point_speed):
+                                        point_speed = float(ext.text)
+                                except (TypeError, ValueError):
+                                    pass
+                    ele_append(point_ele)
+                    time_append(point_time)
+                    speed_append(point_speed)
+                    distance_append(point_distance)
+                    _release_element(elem)
+        except Exception as e:
+            logger.error(f"Error parsing GPX file {file_path}: {e}")
+            return None
+        
+        # Coordinates and epoch seconds need float64 (float32 resolves only ~1 m of longitude);
+        # elevation, speed and distance keep centimetre precision in float32 at half the memory
+        return {
+            'lat': np.frombuffer(lat),
+            'lon': np.frombuffer(lon),
+            'ele': np.frombuffer(ele).astype(np.float32),
+            'time': np.frombuffer(times),
+            'speed': np.frombuffer(speed).astype(np.float32),
+            'distance': np.frombuffer(distance).astype(np.float32),
+            'segment_ends': np.array(segment_ends, dtype=np.int64),
+        }
+    
+    @staticmethod
+    def get_gpx_arrays(file_path: str) -> Optional[Dict[str, np.ndarray]]:
+        """Return parse_gpx_arrays output for a file, cached in memory and in an .npz file next to it
+        The returned arrays are shared between callers and therefore read-only."""
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            logger.error(f"Error reading GPX file {file_path}: {e}")
+            return None
+        
+        # mtime and size are part of the key, so a rewritten file is never served stale
+        key = (stat.st_mtime_ns, stat.st_size)
+        with GPXProcessor._array_memo_lock:
+            entry = GPXProcessor._array_memo.get(file_path)
+            if entry is not None and entry[0] == key:
+                GPXProcessor._array_memo.move_to_end(file_path)
+                return entry[1]
+        
+        arrays = GPXProcessor._load_gpx_arrays(file_path, *key)
+        with GPXProcessor._array_memo_lock:
+            GPXProcessor._array_memo[file_path] = (key, arrays)
+            GPXProcessor._array_memo.move_to_end(file_path)
+            while len(GPXProcessor._array_memo) > GPXProcessor._array_memo_capacity:
+                GPXProcessor._array_memo.popitem(last=False)
+        return arrays
+    
+    @staticmethod
+    def prefetch_gpx_arrays(file_paths: List[str]):
+        """Parse files whose .npz cache is missing or stale, in worker processes for large batches
+        Parsing holds the GIL, so processes are used instead of threads; later get_gpx_arrays
+        calls then only read the fresh cache files."""
+        stale_paths = [path for path in file_paths if not GPXProcessor._has_fresh_array_cache(path)]
+        for _ in _map_files(GPXProcessor._cache_gpx_arrays, stale_paths, _PARALLEL_PARSE_MIN_BYTES):
+            pass
+    
+    @staticmethod
+    def _cache_gpx_arrays(file_path: str) -> bool:
+        """Worker for prefetch_gpx_arrays; returns a flag so the arrays are not sent back"""
+        return GPXProcessor.get_gpx_arrays(file_path) is not None
+    
+    @staticmethod
+    def _array_cache_path(file_path: str) -> str:
+        """Location of a file's .npz cache: a '.cache' folder beside it, keyed by its absolute path"""
+        cache_key = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()
+        return os.path.join(os.path.dirname(file_path), '.cache', f"{cache_key}.npz")
+    
+    @staticmethod
+    def _has_fresh_array_cache(file_path: str) -> bool:
+        """Whether the file's .npz cache exists and matches its current mtime and size
+        Files already held in memory for their current mtime and size are not re-read from disk."""
+        try:
+            stat = os.stat(file_path)
+            with GPXProcessor._array_memo_lock:
+                entry = GPXProcessor._array_memo.get(file_path)
+            if entry is not None and entry[0] == (stat.st_mtime_ns, stat.st_size):
+                return True
+            with np.load(GPXProcessor._array_cache_path(file_path)) as cached:
+                return (int(cached['source_mtime_ns']) == stat.st_mtime_ns
+                        and int(cached['source_size']) == stat.st_size)
+        except Exception:
+            return False
+    
+    @staticmethod
+    def clear_array_cache():
+        """Drop the in-memory arrays held for get_gpx_arrays (the .npz files are left in place)"""
+        with GPXProcessor._array_memo_lock:
+            GPXProcessor._array_memo.clear()
+    
+    @staticmethod
+    def _load_gpx_arrays(file_path: str, mtime_ns: int, size: int) -> Optional[Dict[str, np.ndarray]]:
+        """Load arrays for one version of a file from the .npz cache, or parse and cache them
+        The cache lives in a '.cache' folder beside the GPX file and is keyed by the file's
+        absolute path; entries are reused only while the file's mtime and size are unchanged."""
+        cache_path = GPXProcessor._array_cache_path(file_path)
+        
+        arrays = None
+        if os.path.exists(cache_path):
+            try:
+                with np.load(cache_path) as cached:
+                    if int(cached['source_mtime_ns']) == mtime_ns and int(cached['source_size']) == size:
+                        arrays = {key: cached[key] for key in cached.files if not key.startswith('source_')}
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable GPX cache {cache_path}: {e}")
+        
+        if arrays is None:
+            arrays = GPXProcessor.parse_gpx_arrays(file_path)
+            if arrays is None:
+                return None
+            
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                # Write to a temporary name first so concurrent readers never see a partial file
+                temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'wb') as f:
+                    np.savez(f, source_mtime_ns=mtime_ns, source_size=size, **arrays)
+                os.replace(temp_path, cache_path)
+            except Exception as e:
+                logger.warning(f"Could not cache GPX arrays for {file_path}: {e}")
+        
+        for values in arrays.values():
+            values.setflags(write=False)
+        return arrays
+    
     @staticmethod
     def has_speed_and_distance_tags(gpx: gpxpy.gpx.GPX) -> bool:
-        """Check if GPX already has speed and distance-to-next tags"""
+        """Check if GPX already has speed and distance-to-next tags
+        Only the first 3 points of each segment with more than one point are checked."""
         for track in gpx.tracks:
             for segment in track.segments:
-                if len(segment.points) > 1:
-                    # Check first few points for speed and distance-to-next
-                    for i, point in enumerate(segment.points[:3]):  # Check first 3 points
-                        # Check for speed (should be present for points after the first)
-                        if i > 0:
-                            has_speed = point.speed is not None
-                            # Also check in extensions
-                            if not has_speed and hasattr(point, 'extensions') and point.extensions:
-                                for ext in point.extensions:
-                                    if hasattr(ext, 'tag') and 'speed' in ext.tag:
-                                        has_speed = True
-                                        break
-                            if not has_speed:
-                                return False
-                        
-                        # Check for distance-to-next (should be present for all but last point)
-                        if i < len(segment.points) - 1:
-                            has_distance = False
-                            if hasattr(point, 'extensions') and point.extensions:
-                                for ext in point.extensions:
-                                    if hasattr(ext, 'tag') and 'distance-to-next' in ext.tag:
-                                        has_distance = True
-                                        break
-                            if not has_distance:
-                                return False
+                points = segment.points
+                if len(points) < 2:
+                    continue
+                head = points[:3]
+                # Speed is expected on every point after the first (attribute or extension)
+                if not all(point.speed is not None or _point_has_extension(point, 'speed') for point in head[1:]):
+                    return False
+                # Distance-to-next is expected on every point except the last
+                if not all(_point_has_extension(point, 'distance-to-next') for point in head[:len(points) - 1]):
+                    return False
+        return True
+    
+    @staticmethod
+    def has_array_speed_and_distance_tags(arrays: Dict[str, np.ndarray]) -> bool:
+        """Check parse_gpx_arrays output for speed and distance-to-next tags
+        Applies the same first-3-points-per-segment rule as has_speed_and_distance_tags."""
+        start = 0
+        for end in arrays['segment_ends'].tolist():
+            if end - start > 1:
+                head_end = min(start + 3, end)
+                if (np.isnan(arrays['speed'][start + 1:head_end]).any()
+                        or np.isnan(arrays['distance'][start:min(head_end, end - 1)]).any()):
+                    return False
+            start = end
         return True
     
+    @staticmethod
+    def _array_exceeds_speed(arrays: Dict[str, np.ndarray], max_speed: float) -> bool:
+        """Whether any point in parse_gpx_arrays output could be faster than max_speed (m/s)
+        Elevations are stored as float32, so each speed is padded by the largest error that
+        rounding can add to an elevation difference; a False answer is therefore exact."""
+        ele = arrays['ele'].astype(np.float64)
+        elevations = np.abs(ele[~np.isnan(ele)])
+        ele_error = float(np.spacing(np.float32(elevations.max()))) if elevations.size else 0.0
+        
+        start = 0
+        for end in arrays['segment_ends'].tolist():
+            if end - start > 1:
+                segment = slice(start, end)
+                times = arrays['time'][segment]
+                _, speeds = GPXProcessor._distances_and_speeds(
+                    arrays['lat'][segment], arrays['lon'][segment], ele[segment], times)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    if (speeds + ele_error / np.diff(times) > max_speed).any():
+                        return True
+            start = end
+        return False
+    
     @staticmethod
     def get_max_speed_and_distance(gpx: gpxpy.gpx.GPX) -> tuple[Optional[float], Optional[float]]:
         """Get maximum speed (m/s) and maximum distance-to-next (meters) from GPX file
@@ -164,56 +587,175 @@ class GPXProcessor:
         
         return max_speed, max_distance
     
+    @staticmethod
+    def segment_coordinates(arrays: Dict[str, np.ndarray],
+                            tolerance: Optional[float] = None) -> List[List[List[float]]]:
+        """[[lat, lon], ...] coordinate lists per non-empty track segment, ready for folium
+        With a tolerance (degrees), each segment is simplified with Ramer-Douglas-Peucker."""
+        boundaries = arrays['segment_ends'][:-1]
+        segments = []
+        for lat, lon in zip(np.split(arrays['lat'], boundaries), np.split(arrays['lon'], boundaries)):
+            if not len(lat):
+                continue
+            if tolerance:
+                keep = _rdp_keep_mask(lat, lon, tolerance)
+                lat, lon = lat[keep], lon[keep]
+            segments.append(np.column_stack((lat, lon)).tolist())
+        return segments
+    
+    @staticmethod
+    def get_array_max_speed_and_distance(arrays: Dict[str, np.ndarray]) -> tuple[Optional[float], Optional[float]]:
+        """Get maximum speed (m/s) and maximum distance-to-next (meters) from parse_gpx_arrays output
+        Returns: (max_speed_ms, max_distance_meters) or (None, None) if no tags found"""
+        speeds = arrays['speed'][~np.isnan(arrays['speed'])]
+        distances = arrays['distance'][~np.isnan(arrays['distance'])]
+        max_speed = float(speeds.max()) if speeds.size else None
+        max_distance = float(distances.max()) if distances.size else None
+        return max_speed, max_distance
+    
+    @staticmethod
+    def get_file_max_speed_and_distance(file_path: str) -> tuple[Optional[float], Optional[float]]:
+        """get_array_max_speed_and_distance for a file, remembered while its mtime and size are unchanged
+        Only the two values are kept, so the file list does not hold every file's arrays in memory."""
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            logger.error(f"Error reading GPX file {file_path}: {e}")
+            return None, None
+        
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = GPXProcessor._speed_summaries.get(file_path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        arrays = GPXProcessor.get_gpx_arrays(file_path)
+        summary = GPXProcessor.get_array_max_speed_and_distance(arrays) if arrays else (None, None)
+        GPXProcessor._speed_summaries[file_path] = (key, summary)
+        return summary
+    
+    @staticmethod
+    def has_speed_summary(file_path: str) -> bool:
+        """Whether get_file_max_speed_and_distance can answer for the file without loading its arrays"""
+        entry = GPXProcessor._speed_summaries.get(file_path)
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return entry[0] == (stat.st_mtime_ns, stat.st_size)
+    
+    @staticmethod
+    def _segment_arrays(points) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Extract latitude, longitude, elevation and epoch-seconds time arrays from trackpoints
+        Missing elevations and times are stored as NaN."""
+        count = len(points)
+        lat = np.fromiter((p.latitude for p in points), dtype=np.float64, count=count)
+        lon = np.fromiter((p.longitude for p in points), dtype=np.float64, count=count)
+        ele = np.fromiter(
+            (p.elevation if p.elevation is not None else np.nan for p in points),
+            dtype=np.float64, count=count
+        )
+        times = np.fromiter(
+            (p.time.timestamp() if p.time else np.nan for p in points),
+            dtype=np.float64, count=count
+        )
+        return lat, lon, ele, times
+    
+    @staticmethod
+    def _haversine_distances(lat: np.ndarray, lon: np.ndarray, ele: np.ndarray) -> np.ndarray:
+        """Vectorized 3D distance (meters) between consecutive points
+        Uses the haversine formula on gpxpy's earth radius; falls back to 2D where elevation is missing.
+        Long segments are processed in tiles that overlap by one point, so the temporaries stay cache-sized."""
+        distances = np.empty(max(len(lat) - 1, 0))
+        for start in range(0, len(distances), _HAVERSINE_TILE):
+            end = min(start + _HAVERSINE_TILE, len(distances))
+            tile = slice(start, end + 1)
+            lat_rad = np.radians(lat[tile])
+            # Each point's cosine is shared by the pairs on either side of it
+            cos_lat = np.cos(lat_rad)
+            sin_half_dlat = np.sin(np.diff(lat_rad) / 2)
+            sin_half_dlon = np.sin(np.radians(np.diff(lon[tile])) / 2)
+            a = sin_half_dlat * sin_half_dlat + cos_lat[:-1] * cos_lat[1:] * (sin_half_dlon * sin_half_dlon)
+            distance_2d = 2 * gpxpy.geo.EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+            elevation_diff = np.diff(ele[tile])
+            elevation_diff[np.isnan(elevation_diff)] = 0.0
+            np.hypot(distance_2d, elevation_diff, out=distances[start:end])
+        return distances
+    
+    @staticmethod
+    def _distances_and_speeds(lat: np.ndarray, lon: np.ndarray, ele: np.ndarray,
+                              times: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Distances (meters) and speeds (m/s) between consecutive points
+        Speed is NaN where the time difference is missing or not positive."""
+        if njit is not None:
+            distances = np.empty(len(lat) - 1)
+            speeds = np.empty(len(lat) - 1)
+            _distance_speed_kernel(lat, lon, ele, times, distances, speeds)
+            return distances, speeds
+        
+        distances = GPXProcessor._haversine_distances(lat, lon, ele)
+        time_diffs = np.diff(times)
+        moving = time_diffs > 0
+        speeds = np.divide(distances, time_diffs, out=np.full_like(distances, np.nan), where=moving)
+        return distances, speeds
+    
+    @staticmethod
+    def _apply_speed_tags(points, distances: np.ndarray, speeds: np.ndarray):
+        """Write speed (m/s) and distance-to-next extension onto a segment's trackpoints"""
+        # Speed for each point after the first; points without a positive
+        # time difference (or without timestamps) are left untouched
+        timed = ~np.isnan(speeds)
+        for i, speed in zip(np.flatnonzero(timed).tolist(), speeds[timed].tolist()):
+            points[i + 1].speed = speed
+        
+        # Distance to next point as extension (all points except the last)
+        make_element = ET.Element
+        for point, distance_to_next in zip(points, distances.tolist()):
+            extensions = point.extensions
+            if extensions is None:
+                extensions = point.extensions = []
+            distance_elem = make_element('distance-to-next')
+            distance_elem.text = str(distance_to_next)
+            extensions.append(distance_elem)
+    
     @staticmethod
     def calculate_speed(gpx: gpxpy.gpx.GPX) -> gpxpy.gpx.GPX:
         """Add speed tags and distance-to-next extension to GPX trackpoints"""
         for track in gpx.tracks:
             for segment in track.segments:
                 points = segment.points
-                for i in range(len(points)):
-                    curr_point = points[i]
-                    
-                    # Calculate speed from previous point (for points after the first)
-                    if i > 0:
-                        prev_point = points[i - 1]
-                        
-                        # Calculate distance and time
-                        distance = curr_point.distance_3d(prev_point)
-                        if distance is None:
-                            distance = curr_point.distance_2d(prev_point)
-                        
-                        time_diff = (curr_point.time - prev_point.time).total_seconds() if curr_point.time and prev_point.time else 0
-                        
-                        # Calculate speed (m/s)
-                        if time_diff > 0 and distance is not None:
-                            speed = distance / time_diff
-                            # Add speed as extension (m/s)
-                            curr_point.speed = speed
-                    
-                    # Calculate distance to next point (for all points except the last)
-                    if i < len(points) - 1:
-                        next_point = points[i + 1]
-                        
-                        # Calculate distance to next point
-                        distance_to_next = next_point.distance_3d(curr_point)
-                        if distance_to_next is None:
-                            distance_to_next = next_point.distance_2d(curr_point)
-                        
-                        # Add distance-to-next as extension
-                        if distance_to_next is not None:
-                            # Create extensions element if it doesn't exist
-                            if not hasattr(curr_point, 'extensions') or curr_point.extensions is None:
-                                curr_point.extensions = []
-                            
-                            # Create the extension element
-                            from xml.etree import ElementTree as ET
-                            distance_elem = ET.Element('distance-to-next')
-                            distance_elem.text = str(distance_to_next)
-                            curr_point.extensions.append(distance_elem)
+                if len(points) < 2:
+                    continue
+                
+                # Distances between consecutive points, computed for the whole segment at once
+                lat, lon, ele, times = GPXProcessor._segment_arrays(points)
+                distances, speeds = GPXProcessor._distances_and_speeds(lat, lon, ele, times)
+                
+                GPXProcessor._apply_speed_tags(points, distances, speeds)
         
         logger.info("Speed tags and distance-to-next extensions added to GPX")
         return gpx
     
+    @staticmethod
+    def _trim_keep_mask(speeds: np.ndarray, max_speed: float) -> np.ndarray:
+        """Boolean mask of points to keep when trimming by speed (NaN speeds are always kept)
+        Points faster than max_speed are dropped; at the 5th consecutive one, the 4 previously
+        kept points and everything from there to the end of the segment are dropped too."""
+        high_speed = speeds > max_speed
+        keep = ~high_speed
+        
+        if high_speed.size >= 5:
+            # Number of high-speed points in each window of 5 consecutive points
+            window_counts = np.convolve(high_speed, np.ones(5, dtype=np.int64), mode='valid')
+            full_windows = np.flatnonzero(window_counts == 5)
+            if full_windows.size:
+                cut = int(full_windows[0]) + 4
+                keep[cut:] = False
+                keep[np.flatnonzero(keep[:cut])[-4:]] = False
+                logger.info(f"Found 5 consecutive high-speed points at index {cut}, trimming remainder of route")
+        
+        return keep
+    
     @staticmethod
     def trim_by_speed(gpx: gpxpy.gpx.GPX, max_speed: float = 50.0) -> gpxpy.gpx.GPX:
         """Remove points with excessive speed (max_speed in m/s, UI uses mph)
@@ -221,54 +763,81 @@ class GPXProcessor:
         removed_count = 0
         for track in gpx.tracks:
             for segment in track.segments:
-                points_to_keep = []
-                consecutive_high_speed = 0
-                trim_all_remaining = False
-                
-                for i, point in enumerate(segment.points):
-                    # If we've decided to trim all remaining points, skip this point
-                    if trim_all_remaining:
-                        removed_count += 1
-                        continue
-                    
-                    if hasattr(point, 'speed') and point.speed is not None:
-                        if point.speed > max_speed:
-                            consecutive_high_speed += 1
-                            
-                            # Check if we've hit 5 consecutive high-speed points
-                            if consecutive_high_speed >= 5:
-                                # Remove the last 4 points we just added (the previous consecutive high-speed points)
-                                points_removed_from_keep = min(4, len(points_to_keep))
-                                if points_removed_from_keep > 0:
-                                    points_to_keep = points_to_keep[:-points_removed_from_keep]
-                                    removed_count += points_removed_from_keep
-                                
-                                # Mark to trim this point and all remaining
-                                trim_all_remaining = True
-                                removed_count += 1
-                                logger.info(f"Found 5 consecutive high-speed points at index {i}, trimming remainder of route")
-                            else:
-                                removed_count += 1
-                        else:
-                            # Speed is within threshold, reset consecutive counter
-                            consecutive_high_speed = 0
-                            points_to_keep.append(point)
-                    else:
-                        # No speed data, keep the point and reset counter
-                        consecutive_high_speed = 0
-                        points_to_keep.append(point)
-                
-                segment.points = points_to_keep
+                points = segment.points
+                speeds = np.fromiter(
+                    (p.speed if p.speed is not None else np.nan for p in points),
+                    dtype=np.float64, count=len(points)
+                )
+                keep = GPXProcessor._trim_keep_mask(speeds, max_speed)
+                removed_count += len(points) - int(keep.sum())
+                segment.points = list(compress(points, keep.tolist()))
         
         logger.info(f"Trimmed {removed_count} points with excessive speed")
         return gpx
     
+    @staticmethod
+    def process(file_path: str, out_path: Optional[str] = None, max_speed: Optional[float] = None,
+                add_speed: bool = True, trim: bool = True) -> bool:
+        """Add missing speed tags and/or trim by speed (m/s) with one parse, one speed pass and one write
+        Speeds used for trimming are computed from the trackpoints, so files that already carry
+        tags (whose speed is not reloaded by gpxpy for GPX 1.1) are trimmed as well."""
+        if out_path in (None, file_path) and trim and max_speed is not None:
+            # Screen the file with the fast streaming parser first; most files in a repeated
+            # trim are already tagged and within the limit, and need no gpxpy parse at all.
+            # Tagging alone (on import) is not screened: fresh exports lack distance-to-next,
+            # so the screen would only add a second parse and an .npz the rewrite makes stale.
+            arrays = GPXProcessor.get_gpx_arrays(file_path)
+            if (arrays is not None
+                    and not (add_speed and not GPXProcessor.has_array_speed_and_distance_tags(arrays))
+                    and not GPXProcessor._array_exceeds_speed(arrays, max_speed)):
+                return True
+        
+        gpx = GPXProcessor.parse_gpx(file_path)
+        if not gpx:
+            return False
+        
+        add_tags = add_speed and not GPXProcessor.has_speed_and_distance_tags(gpx)
+        trim = trim and max_speed is not None
+        if not add_tags and not trim and out_path in (None, file_path):
+            # Nothing to change: leave the file (and its mtime-keyed caches) untouched
+            return True
+        removed_count = 0
+        
+        for track in gpx.tracks:
+            for segment in track.segments:
+                points = segment.points
+                if len(points) < 2:
+                    continue
+                
+                lat, lon, ele, times = GPXProcessor._segment_arrays(points)
+                distances, speeds = GPXProcessor._distances_and_speeds(lat, lon, ele, times)
+                
+                if add_tags:
+                    GPXProcessor._apply_speed_tags(points, distances, speeds)
+                
+                if trim:
+                    # The first point has no incoming speed and is never considered high-speed
+                    keep = GPXProcessor._trim_keep_mask(np.concatenate(([np.nan], speeds)), max_speed)
+                    removed_count += len(points) - int(keep.sum())
+                    segment.points = list(compress(points, keep.tolist()))
+        
+        if add_tags:
+            logger.info(f"Speed tags and distance-to-next extensions added to {file_path}")
+        if trim:
+            logger.info(f"Trimmed {removed_count} points with excessive speed from {file_path}")
+        
+        GPXProcessor.save_gpx(gpx, out_path or file_path)
+        return True
+    
     @staticmethod
     def save_gpx(gpx: gpxpy.gpx.GPX, file_path: str):
-        """Save GPX to file"""
+        """Save GPX to file
+        The XML is written in slices, so the encoder never holds a second copy of the whole document."""
         try:
+            xml = gpx.to_xml()
             with open(file_path, 'w') as f:
-                f.write(gpx.to_xml())
+                for start in range(0, len(xml), _XML_WRITE_CHARS):
+                    f.write(xml[start:start + _XML_WRITE_CHARS])
             logger.info(f"GPX saved to {file_path}")
         except Exception as e:
             logger.error(f"Error saving GPX file: {e}")
@@ -285,6 +854,31 @@ class GPXProcessor:
                 'max_lon': bounds.max_longitude
             }
         return None
+    
+    @staticmethod
+    def merge_bounds(bounds_list) -> Optional[Dict]:
+        """Union of several bounding boxes (None entries are skipped)"""
+        bounds_list = [bounds for bounds in bounds_list if bounds]
+        if not bounds_list:
+            return None
+        return {
+            'min_lat': min(bounds['min_lat'] for bounds in bounds_list),
+            'max_lat': max(bounds['max_lat'] for bounds in bounds_list),
+            'min_lon': min(bounds['min_lon'] for bounds in bounds_list),
+            'max_lon': max(bounds['max_lon'] for bounds in bounds_list)
+        }
+    
+    @staticmethod
+    def get_array_bounds(arrays: Dict[str, np.ndarray]) -> Optional[Dict]:
+        """Get bounding box of parse_gpx_arrays output"""
+        if not arrays['lat'].size:
+            return None
+        return {
+            'min_lat': float(arrays['lat'].min()),
+            'max_lat': float(arrays['lat'].max()),
+            'min_lon': float(arrays['lon'].min()),
+            'max_lon': float(arrays['lon'].max())
+        }
 
 
 class GPXWorkbenchApp:
@@ -299,18 +893,38 @@ class GPXWorkbenchApp:
         
         self.persistent_data = PersistentData()
         self.processor = GPXProcessor()
+        
+        # Reverse geocoder is created on first use and shared so its HTTP connections are reused
+        self._geolocator = None
+        self._geolocator_lock = threading.Lock()
+        self._reverse_geocode = None
+        # Place names by center rounded to 3 decimals (about 100 m), shared by routes from the same spot
+        self._place_cache: Dict[tuple, str] = {}
         self.temp_dir = self.persistent_data.data["temp_dir"]
+        # temp_dir with a trailing separator: paths inside it are built by concatenation in per-file loops
+        self._temp_prefix = os.path.join(self.temp_dir, '')
         
         # Ensure temp directory exists
         os.makedirs(self.temp_dir, exist_ok=True)
         
         # File selection state
-        self.selected_files: List[str] = []
+        self.selected_files: Set[str] = set()
         self.file_checkboxes: Dict[str, ft.Checkbox] = {}
+        # Held by the background export import and by handlers that touch the temp directory or
+        # the file list, so the import thread and UI event threads never interleave on them
+        self._files_lock = threading.RLock()
+        
+        # Sorted .gpx names and the directory key they were listed under
+        self._gpx_listing: List[str] = []
+        self._gpx_listing_key: Optional[tuple] = None
         
         # UI Controls
         self.files_list_view = ft.ListView(expand=True, spacing=10, padding=10)
         self.status_text = ft.Text("Ready", size=14)
+        self._last_status_update = 0.0
+        # Pending timer that sends a status refresh update_status throttled, if any
+        self._status_flush: Optional[threading.Timer] = None
+        self._status_lock = threading.Lock()
         self.map_output = ft.Text("", size=12)
         
         # Progress indicators for export extraction
@@ -335,7 +949,7 @@ class GPXWorkbenchApp:
         
         existing_gpx_count = 0
         if os.path.exists(self.temp_dir):
-            existing_gpx_count = len([f for f in os.listdir(self.temp_dir) if f.endswith('.gpx')])
+            existing_gpx_count = len(self._list_gpx_files())
         
         self.has_export_zip = export_file is not None and existing_gpx_count == 0
         self.export_zip_path = export_file
@@ -348,25 +962,21 @@ class GPXWorkbenchApp:
         # Force page update to render the UI including progress indicator
         self.page.update()
         
-        # If export.zip found, extract it immediately (UI is now ready)
+        # If export.zip found, extract it in the background so the window is usable right away;
+        # the progress indicator and status text report on it, and the file list refreshes when done
         if self.has_export_zip:
-            self.auto_extract_health_export()
+            threading.Thread(target=self.auto_extract_health_export, name="health-export-import", daemon=True).start()
     
     def find_latest_export_file(self, downloads_dir: Path) -> Optional[Path]:
         """Find the latest export.zip file, checking for numbered versions like 'export 2.zip', 'export 3.zip', etc."""
-        import re
-        
         if not downloads_dir.exists():
             logger.info(f"Downloads directory does not exist: {downloads_dir}")
             return None
         
-        # Pattern to match export.zip, export 2.zip, export 3.zip, etc.
-        pattern = re.compile(r'^export(?: (\d+))?\.zip$', re.IGNORECASE)
-        
         matches = []
         for file in downloads_dir.iterdir():
             if file.is_file():
-                match = pattern.match(file.name)
+                match = _EXPORT_ZIP_RE.match(file.name)
                 if match:
                     # Extract number (0 for plain export.zip, N for export N.zip)
                     number = int(match.group(1)) if match.group(1) else 0
@@ -383,20 +993,22 @@ class GPXWorkbenchApp:
         logger.info(f"Selected export file: {latest_file.name} (from {len(matches)} candidates)")
         return latest_file
     
-    def parse_export_xml_for_activities(self, extract_dir):
-        """Parse Export.xml to extract workout activity types and associate them with GPX files"""
-        import xml.etree.ElementTree as ET
-        from datetime import datetime
-        
-        export_xml_path = extract_dir / "apple_health_export" / "Export.xml"
+    def parse_export_xml_for_activities(self, zip_ref: zipfile.ZipFile):
+        """Parse Export.xml inside the health export zip to extract workout activity types and associate them with GPX files"""
+        # Member names are case-sensitive in the zip; Apple has shipped both Export.xml and export.xml
+        export_xml_info = next(
+            (info for info in zip_ref.infolist() if info.filename.lower() == 'apple_health_export/export.xml'),
+            None
+        )
         
-        if not export_xml_path.exists():
+        if export_xml_info is None:
             logger.warning("Export.xml not found in health export")
             return {}
         
         try:
             logger.info("Parsing Export.xml for workout activity types...")
-            tree = ET.parse(export_xml_path)
+            with zip_ref.open(export_xml_info) as export_xml:
+                tree = ET.parse(export_xml)
             root = tree.getroot()
             
             # Dictionary to store activity types by workout date/time
@@ -449,31 +1061,18 @@ class GPXWorkbenchApp:
     
     def match_gpx_to_activity(self, gpx_filename, workout_activities):
         """Match a GPX filename to its activity type using the workout activities dict"""
-        import re
-        
         # Extract date/time from GPX filename: route_2025-10-10_2.40pm.gpx
-        match = re.match(r'route_(\d{4}-\d{2}-\d{2})_(\d{1,2})\.(\d{2})(am|pm)\.gpx', gpx_filename)
+        base_time = _parse_filename_date(gpx_filename) if gpx_filename.startswith('route_') else None
         
-        if match:
-            date_part, hour, minute, period = match.groups()
-            hour = int(hour)
-            
-            # Convert 12-hour to 24-hour format
-            if period == 'pm' and hour != 12:
-                hour += 12
-            elif period == 'am' and hour == 12:
-                hour = 0
-            
+        if base_time is not None:
             # Create key to match workout_activities
-            date_key = f"{date_part}_{hour:02d}.{minute}"
+            date_key = base_time.strftime('%Y-%m-%d_%H.%M')
             
             # Try exact match first, then try nearby times (within 5 minutes)
             if date_key in workout_activities:
                 return workout_activities[date_key]
             
             # Try nearby times (GPX file times might be slightly different from workout start times)
-            base_time = datetime.strptime(f"{date_part} {hour:02d}:{minute}", '%Y-%m-%d %H:%M')
-            
             for key, activity in workout_activities.items():
                 try:
                     workout_time = datetime.strptime(key, '%Y-%m-%d_%H.%M')
@@ -491,126 +1090,129 @@ class GPXWorkbenchApp:
     
     def auto_extract_health_export(self):
         """Automatically check for and extract export.zip from Downloads folder"""
-        try:
-            # Check if GPX files already exist in temp directory
-            if os.path.exists(self.temp_dir):
-                existing_gpx = [f for f in os.listdir(self.temp_dir) if f.endswith('.gpx')]
-                if existing_gpx:
-                    logger.info(f"Skipping auto-extraction: {len(existing_gpx)} GPX files already exist in temp directory")
-                    return
-            
-            # Use the export file path found during initialization
-            if not self.export_zip_path or not self.export_zip_path.exists():
-                logger.info("No export.zip found in Downloads folder")
-                return
-            
-            downloads_path = self.export_zip_path
-            logger.info(f"Found export file at {downloads_path}")
-            
-            # Show progress indicator
-            filename = downloads_path.name
-            self.progress_container.visible = True
-            self.progress_ring.visible = True
-            self.progress_text.visible = True
-            self.progress_text.value = f"📦 Found {filename} in Downloads - extracting..."
-            self.update_status(f"📦 Found {filename} in Downloads - extracting...")
-            self.page.update()
-            time.sleep(0.1)  # Give UI time to render
-            
-            # Extract to a temporary location
-            extract_dir = Path(self.temp_dir) / "health_export_temp"
-            
-            # Remove old extraction if exists
-            if extract_dir.exists():
-                shutil.rmtree(extract_dir)
-            
-            logger.info("Extracting export.zip...")
-            self.progress_text.value = f"📂 Extracting {filename}..."
-            self.update_status(f"📂 Extracting {filename}...")
-            self.page.update()
-            time.sleep(0.1)
-            with zipfile.ZipFile(downloads_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            
-            # Parse Export.xml to get workout activity types
-            self.progress_text.value = "📋 Parsing workout data..."
-            self.update_status("📋 Parsing workout data...")
-            self.page.update()
-            time.sleep(0.1)
-            workout_activities = self.parse_export_xml_for_activities(extract_dir)
+        with self._files_lock:
+            try:
+                # Check if GPX files already exist in temp directory
+                if os.path.exists(self.temp_dir):
+                    existing_gpx = self._list_gpx_files()
+                    if existing_gpx:
+                        logger.info(f"Skipping auto-extraction: {len(existing_gpx)} GPX files already exist in temp directory")
+                        return
             
-            # Look for workout-routes folder
-            workout_routes_path = extract_dir / "apple_health_export" / "workout-routes"
+                # Use the export file path found during initialization
+                if not self.export_zip_path or not self.export_zip_path.exists():
+                    logger.info("No export.zip found in Downloads folder")
+                    return
             
-            if not workout_routes_path.exists():
-                logger.warning(f"workout-routes folder not found in export.zip")
-                # Clean up
-                shutil.rmtree(extract_dir)
-                return
+                downloads_path = self.export_zip_path
+                logger.info(f"Found export file at {downloads_path}")
             
-            # Copy all GPX files from workout-routes to temp directory with activity-based names
-            gpx_files = list(workout_routes_path.glob("*.gpx"))
-            copied_count = 0
-            total_files = len(gpx_files)
+                # Show progress indicator
+                filename = downloads_path.name
+                self.progress_container.visible = True
+                self.progress_ring.visible = True
+                self.progress_text.visible = True
+                self.progress_text.value = f"📦 Found {filename} in Downloads - extracting..."
+                self.update_status(f"📦 Found {filename} in Downloads - extracting...")
+                self.page.update()
+                time.sleep(0.1)  # Give UI time to render
             
-            # Show progress bar
-            self.progress_bar.visible = True
-            self.progress_bar.value = 0
-            self.progress_text.value = f"🚶 Processing {total_files} workout routes..."
-            self.update_status(f"🚶 Processing {total_files} workout routes...")
-            self.page.update()
-            time.sleep(0.1)
+                # Read the archive in place: only the workout routes are written to disk, straight into the temp directory
+                logger.info("Extracting export.zip...")
+                self.progress_text.value = f"📂 Extracting {filename}..."
+                self.update_status(f"📂 Extracting {filename}...")
+                self.page.update()
+                time.sleep(0.1)
+                with zipfile.ZipFile(downloads_path, 'r') as zip_ref:
+                    # Parse Export.xml to get workout activity types
+                    self.progress_text.value = "📋 Parsing workout data..."
+                    self.update_status("📋 Parsing workout data...")
+                    self.page.update()
+                    time.sleep(0.1)
+                    workout_activities = self.parse_export_xml_for_activities(zip_ref)
+                
+                    # Look for GPX files directly inside the workout-routes folder
+                    gpx_members = [
+                        info for info in zip_ref.infolist()
+                        if not info.is_dir()
+                        and os.path.dirname(info.filename).lower() == 'apple_health_export/workout-routes'
+                        and info.filename.endswith('.gpx')
+                    ]
+                
+                    if not gpx_members:
+                        logger.warning(f"workout-routes folder not found in export.zip")
+                        return
+                
+                    # Copy all GPX files from workout-routes to temp directory with activity-based names
+                    copied_count = 0
+                    copied_paths = []
+                    total_files = len(gpx_members)
+                
+                    # Show progress bar
+                    self.progress_bar.visible = True
+                    self.progress_bar.value = 0
+                    self.progress_text.value = f"🚶 Processing {total_files} workout routes..."
+                    self.update_status(f"🚶 Processing {total_files} workout routes...")
+                    self.page.update()
+                    time.sleep(0.1)
+                
+                    for i, gpx_member in enumerate(gpx_members, 1):
+                        gpx_name = os.path.basename(gpx_member.filename)
+                        try:
+                            # Update progress
+                            progress = i / total_files
+                            self.progress_bar.value = progress
+                            if i % 5 == 0 or i == total_files:
+                                self.progress_text.value = f"🚶 Processing workout routes... ({i}/{total_files})"
+                                self.page.update()
+                            if i % 10 == 0 or i == total_files:
+                                self.update_status(f"🚶 Processing workout routes... ({i}/{total_files})")
+                        
+                            # Determine activity type for this GPX file
+                            activity_type = self.match_gpx_to_activity(gpx_name, workout_activities)
+                        
+                            # Create new filename with activity type instead of "route"
+                            new_filename = gpx_name.replace('route_', f'{activity_type.lower()}_')
+                            dest_path = Path(self.temp_dir) / new_filename
+                        
+                            with zip_ref.open(gpx_member) as src, open(dest_path, 'wb') as dst:
+                                shutil.copyfileobj(src, dst, length=1 << 20)
+                            copied_paths.append(str(dest_path))
+                            copied_count += 1
+                        
+                            logger.info(f"Copied {gpx_name} -> {new_filename} ({activity_type})")
+                        except Exception as e:
+                            logger.error(f"Error copying {gpx_name}: {e}")
             
-            for i, gpx_file in enumerate(gpx_files, 1):
-                try:
-                    # Update progress
-                    progress = i / total_files
-                    self.progress_bar.value = progress
-                    if i % 5 == 0 or i == total_files:
-                        self.progress_text.value = f"🚶 Processing workout routes... ({i}/{total_files})"
+                # Automatically add speed tags where missing; copying is fast, tagging is CPU-bound
+                # and runs across processes once every route is on disk
+                def report_tagging(done):
+                    self.progress_bar.value = done / len(copied_paths)
+                    if done % 5 == 0 or done == len(copied_paths):
+                        self.progress_text.value = f"⚡ Adding speed tags... ({done}/{len(copied_paths)})"
                         self.page.update()
-                    if i % 10 == 0 or i == total_files:
-                        self.update_status(f"🚶 Processing workout routes... ({i}/{total_files})")
-                    
-                    # Determine activity type for this GPX file
-                    activity_type = self.match_gpx_to_activity(gpx_file.name, workout_activities)
-                    
-                    # Create new filename with activity type instead of "route"
-                    new_filename = gpx_file.name.replace('route_', f'{activity_type.lower()}_')
-                    dest_path = Path(self.temp_dir) / new_filename
-                    
-                    shutil.copy2(gpx_file, dest_path)
-                    copied_count += 1
-                    
-                    logger.info(f"Copied {gpx_file.name} -> {new_filename} ({activity_type})")
-                    
-                    # Automatically add speed tags if not present
-                    self.processor.parse_gpx(str(dest_path), auto_add_speed=True)
-                except Exception as e:
-                    logger.error(f"Error copying {gpx_file.name}: {e}")
             
-            logger.info(f"Extracted {copied_count} GPX files from export.zip")
+                self.progress_bar.value = 0
+                self.progress_text.value = f"⚡ Adding speed tags to {len(copied_paths)} routes..."
+                self.update_status(f"⚡ Adding speed tags to {len(copied_paths)} routes...")
+                self.page.update()
+                self._add_missing_speed_tags(copied_paths, on_progress=report_tagging)
             
-            # Clean up extraction directory
-            self.progress_text.value = "🧹 Cleaning up..."
-            self.update_status("🧹 Cleaning up...")
-            self.page.update()
-            time.sleep(0.1)
-            shutil.rmtree(extract_dir)
+                logger.info(f"Extracted {copied_count} GPX files from export.zip")
             
-            # Hide progress indicator
-            self.progress_container.visible = False
-            self.progress_ring.visible = False
-            self.progress_bar.visible = False
-            self.progress_text.visible = False
+                # Hide progress indicator
+                self.progress_container.visible = False
+                self.progress_ring.visible = False
+                self.progress_bar.visible = False
+                self.progress_text.visible = False
             
-            # Update final status and refresh file list
-            self.update_status(f"✅ Auto-extracted {copied_count} routes from Downloads/{filename}")
-            self.page.update()
-            self.refresh_file_list(None)
+                # Update final status and refresh file list
+                self.update_status(f"✅ Auto-extracted {copied_count} routes from Downloads/{filename}")
+                self.page.update()
+                self.refresh_file_list(None)
             
-        except Exception as e:
-            logger.error(f"Error auto-extracting health export: {e}")
+            except Exception as e:
+                logger.error(f"Error auto-extracting health export: {e}")
     
     def build_ui(self):
         """Build the user interface"""
@@ -734,8 +1336,7 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
         # Check if GPX files exist to determine initial collapsed state
         has_gpx_files = False
         if os.path.exists(self.temp_dir):
-            existing_gpx = [f for f in os.listdir(self.temp_dir) if f.endswith('.gpx')]
-            has_gpx_files = len(existing_gpx) > 0
+            has_gpx_files = len(self._list_gpx_files()) > 0
         
         # Create the instructions content container
         self.instructions_content = ft.Container(
@@ -955,39 +1556,61 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
             border_radius=10
         )
     
+    def _import_gpx_file(self, source_path: str) -> str:
+        """Copy a picked GPX file into the temp directory and return the copy's path"""
+        dest_path = os.path.join(self.temp_dir, os.path.basename(source_path))
+        # Contents only: the temp copy needs none of the source file's metadata
+        shutil.copyfile(source_path, dest_path)
+        logger.info(f"Copied {os.path.basename(source_path)} to temp directory")
+        return dest_path
+    
+    def _add_missing_speed_tags(self, file_paths: List[str], on_progress: Optional[Callable[[int], None]] = None):
+        """Add speed and distance-to-next tags to the files that lack them
+        Parsing is CPU-bound Python, so large batches are spread across worker processes.
+        on_progress, if given, is called with the number of files finished so far."""
+        results = _map_files(GPXProcessor.process, file_paths, _PARALLEL_REWRITE_MIN_BYTES)
+        for done, _ in enumerate(results, 1):
+            if on_progress:
+                on_progress(done)
+    
     def on_files_selected(self, e):
         """Handle file selection from file picker"""
-        if e.files:
-            logger.info(f"Selected {len(e.files)} files")
-            copied_count = 0
+        with self._files_lock:
+            if e.files:
+                logger.info(f"Selected {len(e.files)} files")
+                imported_paths = []
             
-            for file in e.files:
-                try:
-                    dest_path = os.path.join(self.temp_dir, os.path.basename(file.path))
-                    shutil.copy2(file.path, dest_path)
-                    copied_count += 1
-                    logger.info(f"Copied {file.name} to temp directory")
-                    
-                    # Automatically add speed tags if not present
-                    self.processor.parse_gpx(dest_path, auto_add_speed=True)
-                except Exception as ex:
-                    logger.error(f"Error copying {file.name}: {ex}")
+                # Copies are I/O-bound, so run them concurrently
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    futures = {executor.submit(self._import_gpx_file, file.path): file for file in e.files}
+                    for future in as_completed(futures):
+                        try:
+                            imported_paths.append(future.result())
+                        except Exception as ex:
+                            logger.error(f"Error copying {futures[future].name}: {ex}")
+                copied_count = len(imported_paths)
             
-            self.update_status(f"Copied {copied_count} file(s) to temp directory")
-            self.refresh_file_list(None)
+                # Automatically add speed tags if not present
+                self._add_missing_speed_tags(imported_paths)
+            
+                self.update_status(f"Copied {copied_count} file(s) to temp directory")
+                self.processor.clear_array_cache()
+                self.refresh_file_list(None)
     
     def clear_temp_directory(self, e):
         """Clear the temporary directory"""
-        try:
-            if os.path.exists(self.temp_dir):
-                shutil.rmtree(self.temp_dir)
-                os.makedirs(self.temp_dir, exist_ok=True)
-                logger.info("Cleared temp directory")
-                self.update_status("Temp directory cleared")
-                self.refresh_file_list(None)
-        except Exception as ex:
-            logger.error(f"Error clearing temp directory: {ex}")
-            self.update_status(f"Error: {ex}")
+        with self._files_lock:
+            try:
+                if os.path.exists(self.temp_dir):
+                    shutil.rmtree(self.temp_dir)
+                    os.makedirs(self.temp_dir, exist_ok=True)
+                    logger.info("Cleared temp directory")
+                    self.update_status("Temp directory cleared")
+                    self.processor.clear_array_cache()
+                    self.refresh_file_list(None)
+            except Exception as ex:
+                logger.error(f"Error clearing temp directory: {ex}")
+                self.update_status(f"Error: {ex}")
     
     def open_cutoff_date_picker(self, e):
         """Open the cutoff date picker dialog"""
@@ -1004,90 +1627,113 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
     
     def remove_files_before_date(self, e):
         """Remove GPX files with dates older than the selected cutoff date"""
-        if not os.path.exists(self.temp_dir):
-            self.update_status("Temp directory does not exist")
-            return
+        with self._files_lock:
+            if not os.path.exists(self.temp_dir):
+                self.update_status("Temp directory does not exist")
+                return
         
-        try:
-            gpx_files = [f for f in os.listdir(self.temp_dir) if f.endswith('.gpx')]
-            removed_count = 0
-            kept_count = 0
-            
-            for filename in gpx_files:
-                file_date = self._extract_date_from_filename(filename)
-                
+            try:
+                dir_stat = os.stat(self.temp_dir)
+                # Oldest first, so the files dated before the cutoff form a prefix found by bisection
+                gpx_files = self._sorted_gpx_files((dir_stat.st_mtime_ns, dir_stat.st_ino))[::-1]
                 # Compare dates (ignoring time portion)
-                if file_date.date() < self.selected_cutoff_date.date():
-                    file_path = os.path.join(self.temp_dir, filename)
+                cutoff = datetime.combine(self.selected_cutoff_date.date(), datetime.min.time())
+                # bisect's key argument needs Python 3.10, so search a precomputed list of dates
+                file_dates = [self._extract_date_from_filename(filename) for filename in gpx_files]
+                cut = bisect.bisect_left(file_dates, cutoff)
+                removed_count = 0
+                kept_count = len(gpx_files) - cut
+            
+                for filename, file_date in zip(gpx_files[:cut], file_dates):
+                    file_path = self._temp_prefix + filename
                     try:
                         os.remove(file_path)
                         removed_count += 1
+                        # Its .npz cache would otherwise stay in .cache until Clear Temp
+                        try:
+                            os.remove(self.processor._array_cache_path(file_path))
+                        except FileNotFoundError:
+                            pass
                         logger.info(f"Removed old file: {filename} (date: {file_date.date()})")
                     except Exception as ex:
                         logger.error(f"Error removing {filename}: {ex}")
-                else:
-                    kept_count += 1
             
-            self.update_status(f"Removed {removed_count} file(s) before {self.selected_cutoff_date.strftime('%Y-%m-%d')}, kept {kept_count}")
-            self.refresh_file_list(None)
+                self.update_status(f"Removed {removed_count} file(s) before {self.selected_cutoff_date.strftime('%Y-%m-%d')}, kept {kept_count}")
+                self.processor.clear_array_cache()
+                self.refresh_file_list(None)
             
-        except Exception as ex:
-            logger.error(f"Error removing old files: {ex}")
-            self.update_status(f"Error: {ex}")
+            except Exception as ex:
+                logger.error(f"Error removing old files: {ex}")
+                self.update_status(f"Error: {ex}")
     
     def _extract_date_from_filename(self, filename: str) -> datetime:
         """Extract datetime from filename for sorting (e.g., walking_2025-02-04_9.04am.gpx or route_2025-02-04_9.04am.gpx)"""
-        import re
-        try:
-            # Parse format: activity_YYYY-MM-DD_H.MMam/pm.gpx (new format) or route_YYYY-MM-DD_H.MMam/pm.gpx (old format)
-            # Match any word followed by underscore, then date/time pattern
-            match = re.match(r'\w+_(\d{4})-(\d{2})-(\d{2})_(\d{1,2})\.(\d{2})(am|pm)\.gpx', filename)
-            if match:
-                year, month, day, hour, minute, period = match.groups()
-                hour = int(hour)
-                # Convert 12-hour to 24-hour format
-                if period == 'pm' and hour != 12:
-                    hour += 12
-                elif period == 'am' and hour == 12:
-                    hour = 0
-                return datetime(int(year), int(month), int(day), hour, int(minute))
-        except Exception as e:
-            logger.warning(f"Could not parse date from filename {filename}: {e}")
+        file_date = _parse_filename_date(filename)
+        if file_date is not None:
+            return file_date
         
         # Fallback to file modification time if parsing fails
         try:
-            return datetime.fromtimestamp(os.path.getmtime(os.path.join(self.temp_dir, filename)))
+            return datetime.fromtimestamp(os.path.getmtime(self._temp_prefix + filename))
         except:
             return datetime.min
     
+    def _list_gpx_files(self) -> List[str]:
+        """Names of the regular .gpx files in the temp directory
+        Uses scandir, whose entries carry the file type, so no per-file stat is needed."""
+        with os.scandir(self.temp_dir) as entries:
+            return [entry.name for entry in entries if entry.name.endswith('.gpx') and entry.is_file()]
+    
+    def _sorted_gpx_files(self, dir_key: tuple) -> List[str]:
+        """GPX names in reverse chronological order (newest first), reusing the last listing while
+        the directory is unchanged (e.g. after files are rewritten in place by trimming)"""
+        if dir_key != self._gpx_listing_key:
+            gpx_files = self._list_gpx_files()
+            # Sort by date extracted from filename in reverse chronological order (newest first)
+            gpx_files.sort(key=self._extract_date_from_filename, reverse=True)
+            self._gpx_listing = gpx_files
+            # Names without a date sort by modification time, which rewriting changes, so don't reuse those
+            has_dateless = any(_parse_filename_date(filename) is None for filename in gpx_files)
+            self._gpx_listing_key = None if has_dateless else dir_key
+        return list(self._gpx_listing)
+    
     def refresh_file_list(self, e):
         """Refresh the list of GPX files"""
-        self.files_list_view.controls.clear()
-        self.file_checkboxes.clear()
-        
-        if not os.path.exists(self.temp_dir):
-            os.makedirs(self.temp_dir, exist_ok=True)
-            return
-        
-        gpx_files = [f for f in os.listdir(self.temp_dir) if f.endswith('.gpx')]
-        
-        # Sort by date extracted from filename in reverse chronological order (newest first)
-        gpx_files.sort(key=self._extract_date_from_filename, reverse=True)
+        with self._files_lock:
+            try:
+                dir_stat = os.stat(self.temp_dir)
+            except FileNotFoundError:
+                os.makedirs(self.temp_dir, exist_ok=True)
+                self.file_checkboxes.clear()
+                self.files_list_view.controls = []
+                return
         
-        if not gpx_files:
-            self.files_list_view.controls.append(
-                ft.Text("No GPX files found in temp directory", italic=True, color=ft.colors.GREY_700)
-            )
-        else:
-            for filename in gpx_files:
-                # Parse GPX to check for speed and distance tags
-                file_path = os.path.join(self.temp_dir, filename)
-                label_text = filename
+            dir_key = (dir_stat.st_mtime_ns, dir_stat.st_ino)
+            # Checkboxes of files still present are reused, so Flet only sends changed properties
+            previous_checkboxes = self.file_checkboxes
+            self.file_checkboxes = {}
+        
+            gpx_files = self._sorted_gpx_files(dir_key)
+            # Labels need the arrays of files not summarized yet; parse the uncached ones in parallel up front
+            self.processor.prefetch_gpx_arrays([
+                self._temp_prefix + filename for filename in gpx_files
+                if not self.processor.has_speed_summary(self._temp_prefix + filename)
+            ])
+        
+            # Controls are collected first and swapped in at once, followed by a single page update
+            controls = []
+            if not gpx_files:
+                controls.append(
+                    ft.Text("No GPX files found in temp directory", italic=True, color=ft.colors.GREY_700)
+                )
+            else:
+                for filename in gpx_files:
+                    # Parse GPX to check for speed and distance tags
+                    file_path = self._temp_prefix + filename
+                    label_text = filename
                 
-                try:
-                    gpx = self.processor.parse_gpx(file_path)
-                    if gpx:
-                        max_speed_ms, max_distance_m = self.processor.get_max_speed_and_distance(gpx)
+                    try:
+                        max_speed_ms, max_distance_m = self.processor.get_file_max_speed_and_distance(file_path)
                         
                         if max_speed_ms is not None and max_distance_m is not None:
                             # Convert m/s to mph (1 m/s = 2.23694 mph)
@@ -1096,55 +1742,64 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
                             max_distance_feet = max_distance_m * 3.28084
                             
                             label_text = f"{filename}  [Max: {max_speed_mph:.1f} mph, {max_distance_feet:.1f} ft]"
-                except Exception as ex:
-                    logger.warning(f"Could not read speed/distance from {filename}: {ex}")
+                    except Exception as ex:
+                        logger.warning(f"Could not read speed/distance from {filename}: {ex}")
                 
-                checkbox = ft.Checkbox(
-                    label=label_text,
-                    value=filename in self.selected_files,
-                    on_change=lambda e, f=filename: self.on_file_checkbox_changed(f, e.control.value)
-                )
-                self.file_checkboxes[filename] = checkbox
-                self.files_list_view.controls.append(checkbox)
+                    checkbox = previous_checkboxes.get(filename)
+                    if checkbox is None:
+                        checkbox = ft.Checkbox(
+                            label=label_text,
+                            value=filename in self.selected_files,
+                            on_change=lambda e, f=filename: self.on_file_checkbox_changed(f, e.control.value)
+                        )
+                    else:
+                        checkbox.label = label_text
+                        checkbox.value = filename in self.selected_files
+                    self.file_checkboxes[filename] = checkbox
+                    controls.append(checkbox)
         
-        # Update instructions expansion state based on whether files exist
-        if hasattr(self, 'instructions_content'):
-            should_show = len(gpx_files) == 0
-            self.instructions_content.visible = should_show
-            if hasattr(self, 'instructions_toggle_icon'):
-                self.instructions_toggle_icon.name = ft.icons.EXPAND_LESS if should_show else ft.icons.EXPAND_MORE
+            self.files_list_view.controls = controls
         
-        self.page.update()
-        logger.info(f"File list refreshed: {len(gpx_files)} files found")
+            # Update instructions expansion state based on whether files exist
+            if hasattr(self, 'instructions_content'):
+                should_show = len(gpx_files) == 0
+                self.instructions_content.visible = should_show
+                if hasattr(self, 'instructions_toggle_icon'):
+                    self.instructions_toggle_icon.name = ft.icons.EXPAND_LESS if should_show else ft.icons.EXPAND_MORE
+        
+            self.page.update()
+            logger.info(f"File list refreshed: {len(gpx_files)} files found")
     
     def on_file_checkbox_changed(self, filename: str, is_checked: bool):
         """Handle file checkbox change"""
-        if is_checked and filename not in self.selected_files:
-            self.selected_files.append(filename)
-        elif not is_checked and filename in self.selected_files:
-            self.selected_files.remove(filename)
+        if is_checked:
+            self.selected_files.add(filename)
+        else:
+            self.selected_files.discard(filename)
         
         self.update_status(f"Selected {len(self.selected_files)} file(s)")
         logger.info(f"File selection changed: {filename} = {is_checked}")
     
     def select_all_files(self, e):
         """Select all files"""
-        for filename, checkbox in self.file_checkboxes.items():
-            checkbox.value = True
-            if filename not in self.selected_files:
-                self.selected_files.append(filename)
+        with self._files_lock:
+            for checkbox in self.file_checkboxes.values():
+                checkbox.value = True
+            self.selected_files.update(self.file_checkboxes)
         
-        self.page.update()
-        self.update_status(f"Selected all {len(self.selected_files)} file(s)")
+            # Checkbox values and the status line go out in one page update
+            self.update_status(f"Selected all {len(self.selected_files)} file(s)", refresh_page=False)
+            self.page.update()
     
     def deselect_all_files(self, e):
         """Deselect all files"""
-        for checkbox in self.file_checkboxes.values():
-            checkbox.value = False
+        with self._files_lock:
+            for checkbox in self.file_checkboxes.values():
+                checkbox.value = False
         
-        self.selected_files.clear()
-        self.page.update()
-        self.update_status("Deselected all files")
+            self.selected_files.clear()
+            self.update_status("Deselected all files", refresh_page=False)
+            self.page.update()
     
     def visualize_routes(self, e):
         """Visualize selected routes"""
@@ -1152,40 +1807,45 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
             self.update_status("No files selected for visualization")
             return
         
+        # Sorted so route colors and the map center are stable between runs
+        selected_files = sorted(self.selected_files)
+        
         try:
             import folium
             
+            # Parse any uncached routes in parallel before building the map(s)
+            self.processor.prefetch_gpx_arrays([self._temp_prefix + filename for filename in selected_files])
+            
             if self.separate_maps_checkbox.value:
                 # Create individual maps for each route
                 created_files = []
                 
-                for filename in self.selected_files:
-                    file_path = os.path.join(self.temp_dir, filename)
-                    gpx_data = self.processor.parse_gpx(file_path)
+                for filename in selected_files:
+                    file_path = self._temp_prefix + filename
+                    arrays = self.processor.get_gpx_arrays(file_path)
                     
-                    if gpx_data:
-                        bounds = self.processor.get_gpx_bounds(gpx_data)
+                    if arrays:
+                        bounds = self.processor.get_array_bounds(arrays)
                         if bounds:
                             center_lat = (bounds['min_lat'] + bounds['max_lat']) / 2
                             center_lon = (bounds['min_lon'] + bounds['max_lon']) / 2
                             
                             m = folium.Map(location=[center_lat, center_lon], zoom_start=13)
+                            routes_group = folium.FeatureGroup(name='routes').add_to(m)
                             
                             # Add this route to the map
-                            for track in gpx_data.tracks:
-                                for segment in track.segments:
-                                    points = [(point.latitude, point.longitude) for point in segment.points]
-                                    folium.PolyLine(
-                                        points, 
-                                        color='blue', 
-                                        weight=3, 
-                                        opacity=0.7, 
-                                        popup=filename,
-                                        tooltip=filename
-                                    ).add_to(m)
+                            for points in self.processor.segment_coordinates(arrays, _MAP_SIMPLIFY_TOLERANCE):
+                                folium.PolyLine(
+                                    points, 
+                                    color='blue', 
+                                    weight=3, 
+                                    opacity=0.7, 
+                                    popup=filename,
+                                    tooltip=filename
+                                ).add_to(routes_group)
                             
                             # Save map with route name
-                            html_filename = filename.replace('.gpx', '.html')
+                            html_filename = filename.removesuffix('.gpx') + '.html'
                             map_file = os.path.join(self.temp_dir, html_filename)
                             m.save(map_file)
                             created_files.append(map_file)
@@ -1197,47 +1857,49 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
                 # Auto-open in browser if checkbox is checked
                 if self.auto_open_map_checkbox.value and created_files:
                     try:
+                        # Resolve the default browser once rather than on every open
+                        browser = webbrowser.get()
                         for map_file in created_files:
-                            webbrowser.open(f"file://{os.path.abspath(map_file)}")
+                            browser.open_new_tab(f"file://{os.path.abspath(map_file)}")
                         logger.info(f"Opened {len(created_files)} maps in browser tabs")
                         self.map_output.value = f"✅ Created and opened {len(created_files)} individual maps in browser"
                     except Exception as browser_error:
                         logger.warning(f"Could not auto-open browser: {browser_error}")
                 
             else:
-                # Create a single combined map
-                first_file = os.path.join(self.temp_dir, self.selected_files[0])
-                gpx = self.processor.parse_gpx(first_file)
+                # Create a single combined map, framed on the union of all route bounding boxes
+                routes = [
+                    (filename, self.processor.get_gpx_arrays(self._temp_prefix + filename))
+                    for filename in selected_files
+                ]
+                parsed_routes = [arrays for _, arrays in routes if arrays]
                 
-                if gpx:
-                    bounds = self.processor.get_gpx_bounds(gpx)
+                if parsed_routes:
+                    bounds = self.processor.merge_bounds(
+                        self.processor.get_array_bounds(arrays) for arrays in parsed_routes
+                    )
                     if bounds:
                         center_lat = (bounds['min_lat'] + bounds['max_lat']) / 2
                         center_lon = (bounds['min_lon'] + bounds['max_lon']) / 2
                         
                         m = folium.Map(location=[center_lat, center_lon], zoom_start=13)
+                        m.fit_bounds([[bounds['min_lat'], bounds['min_lon']], [bounds['max_lat'], bounds['max_lon']]])
+                        routes_group = folium.FeatureGroup(name='routes').add_to(m)
                         
                         # Add all selected routes to the map
                         colors = ['blue', 'red', 'green', 'purple', 'orange', 'darkred', 'lightred', 'beige', 'darkblue', 'darkgreen']
                         
-                        for idx, filename in enumerate(self.selected_files):
-                            file_path = os.path.join(self.temp_dir, filename)
-                            gpx_data = self.processor.parse_gpx(file_path)
-                            
-                            if gpx_data:
-                                color = colors[idx % len(colors)]
-                                
-                                for track in gpx_data.tracks:
-                                    for segment in track.segments:
-                                        points = [(point.latitude, point.longitude) for point in segment.points]
-                                        folium.PolyLine(
-                                            points, 
-                                            color=color, 
-                                            weight=3, 
-                                            opacity=0.7, 
-                                            popup=filename,
-                                            tooltip=filename
-                                        ).add_to(m)
+                        for (filename, arrays), color in zip(routes, cycle(colors)):
+                            if arrays:
+                                for points in self.processor.segment_coordinates(arrays, _MAP_SIMPLIFY_TOLERANCE):
+                                    folium.PolyLine(
+                                        points, 
+                                        color=color, 
+                                        weight=3, 
+                                        opacity=0.7, 
+                                        popup=filename,
+                                        tooltip=filename
+                                    ).add_to(routes_group)
                         
                         # Save combined map
                         map_file = os.path.join(self.temp_dir, "routes_map.html")
@@ -1259,7 +1921,7 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
                     else:
                         self.update_status("Could not determine route bounds")
                 else:
-                    self.update_status("Error parsing first GPX file")
+                    self.update_status("Error parsing selected GPX files")
         
         except Exception as ex:
             logger.error(f"Error visualizing routes: {ex}")
@@ -1281,58 +1943,78 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
             self.update_status("Invalid max speed value")
             return
         
-        processed_count = 0
+        with self._files_lock:
+            file_paths = [self._temp_prefix + filename for filename in sorted(self.selected_files)]
+            trim_file = partial(GPXProcessor.process, max_speed=max_speed_ms)
+            self.update_status(f"✂️ Trimming {len(file_paths)} file(s)...")
         
-        for filename in self.selected_files:
-            file_path = os.path.join(self.temp_dir, filename)
-            gpx = self.processor.parse_gpx(file_path)
-            
-            if gpx:
-                # Ensure speed tags are present (should already exist from auto-processing)
-                if not self.processor.has_speed_and_distance_tags(gpx):
-                    gpx = self.processor.calculate_speed(gpx)
-                
-                # Trim by speed threshold (using m/s internally)
-                gpx = self.processor.trim_by_speed(gpx, max_speed_ms)
-                
-                # Replace the original file
-                self.processor.save_gpx(gpx, file_path)
-                processed_count += 1
+            # Files are independent and parsing is CPU-bound, so large batches use worker processes
+            processed_count = sum(_map_files(trim_file, file_paths, _PARALLEL_REWRITE_MIN_BYTES))
         
-        self.update_status(f"Trimmed {processed_count} file(s) by speed (max: {max_speed_mph} mph)")
-        self.refresh_file_list(None)
+            self.update_status(f"Trimmed {processed_count} file(s) by speed (max: {max_speed_mph} mph)")
+            self.refresh_file_list(None)
     
-    def get_track_center(self, gpx):
-        """Calculate map center (lat, lon) from a gpxpy track object"""
-        lats = []
-        lons = []
-        for track in gpx.tracks:
-            for segment in track.segments:
-                for point in segment.points:
-                    lats.append(point.latitude)
-                    lons.append(point.longitude)
-        if lats and lons:
-            center_lat = sum(lats) / len(lats)
-            center_lon = sum(lons) / len(lons)
-            return (center_lat, center_lon)
+    def get_track_center(self, arrays):
+        """Calculate map center (lat, lon) from parse_gpx_arrays output"""
+        if arrays['lat'].size:
+            return (float(arrays['lat'].mean()), float(arrays['lon'].mean()))
         return (0, 0)
     
-    def get_datetime(self, gpx):
-        """Fetch the first <time> tag from a GPX and return a datetime object"""
-        for track in gpx.tracks:
-            for segment in track.segments:
-                for point in segment.points:
-                    if point.time:
-                        return point.time
+    def get_datetime(self, file_path):
+        """Fetch the first trackpoint <time> in a GPX file and return it as gpxpy parses it
+        The file's own timezone (offset, UTC or none) is kept; only the file's head is streamed."""
+        try:
+            with open(file_path, 'rb') as gpx_file:
+                for _, elem in xml_etree.iterparse(gpx_file, events=('end',), **_ITERPARSE_KWARGS):
+                    if _local_name(elem.tag) != 'trkpt':
+                        continue
+                    for child in elem:
+                        if _local_name(child.tag) == 'time' and child.text and child.text.strip():
+                            return gpxpy.gpxfield.parse_time(child.text.strip())
+                    _release_element(elem)
+        except Exception as e:
+            logger.error(f"Error reading time from {file_path}: {e}")
         return None
     
+    def get_geolocator(self):
+        """Return the shared Nominatim geocoder, backed by a pooled keep-alive HTTP session
+        Also sets up self._reverse_geocode, its reverse lookup limited to one request per second."""
+        with self._geolocator_lock:
+            if self._geolocator is None:
+                from geopy.adapters import RequestsAdapter
+                from geopy.extra.rate_limiter import RateLimiter
+                from geopy.geocoders import Nominatim
+                from urllib3.util.retry import Retry
+                
+                self._geolocator = Nominatim(
+                    user_agent="gpx-routes-workbench",
+                    adapter_factory=partial(
+                        RequestsAdapter,
+                        pool_connections=8,
+                        pool_maxsize=8,
+                        max_retries=Retry(total=3, backoff_factor=0.3)
+                    )
+                )
+                # Nominatim's usage policy allows one request per second; the limiter is thread-safe,
+                # so the concurrent posting threads queue on it. The adapter already retries.
+                self._reverse_geocode = RateLimiter(
+                    self._geolocator.reverse, min_delay_seconds=1, max_retries=0, swallow_exceptions=False
+                )
+            return self._geolocator
+    
     def identify_place(self, lat, lon):
-        """Use reverse geocoding to identify the location"""
+        """Use reverse geocoding to identify the location
+        Results are remembered for the session, so nearby routes need no further lookup."""
+        cache_key = (round(lat, 3), round(lon, 3))
+        place = self._place_cache.get(cache_key)
+        if place is not None:
+            return place
+        
         try:
-            from geopy.geocoders import Nominatim
-            geolocator = Nominatim(user_agent="gpx-routes-workbench")
+            self.get_geolocator()
             coord = f"{lat}, {lon}"
-            location = geolocator.reverse(coord, timeout=10)
+            location = self._reverse_geocode(coord, timeout=10)
+            place = "Unknown Location"
             if location:
                 address = location.raw['address']
                 town = address.get('town', '')
@@ -1340,16 +2022,93 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
                 county = address.get('county', '')
                 
                 if town:
-                    return f"in {town}"
+                    place = f"in {town}"
                 elif city:
-                    return f"in {city}"
+                    place = f"in {city}"
                 elif county:
-                    return f"in {county}"
-            return "Unknown Location"
+                    place = f"in {county}"
+            self._place_cache[cache_key] = place
+            return place
         except Exception as e:
             logger.warning(f"Could not identify location: {e}")
             return "Unknown Location"
     
+    def _post_route_to_hikes(self, filename: str, hikes_path: str) -> bool:
+        """Write the markdown page and copy the GPX file for one route into the Hikes repository"""
+        file_path = self._temp_prefix + filename
+        
+        try:
+            # Only the center and start time are needed, so stream the trackpoints instead of
+            # loading a full gpxpy object tree
+            arrays = self.processor.get_gpx_arrays(file_path)
+            if arrays is None:
+                logger.error(f"Could not parse {filename}")
+                return False
+            
+            # Extract GPX metadata
+            center = self.get_track_center(arrays)
+            dt = self.get_datetime(file_path)
+            
+            if not dt:
+                logger.error(f"No datetime found in {filename}")
+                return False
+            
+            place = self.identify_place(center[0], center[1])
+            
+            # Extract activity type from filename (e.g., walking_2025-10-10_2.40pm.gpx)
+            mode = "Walking"  # Default mode
+            if '_' in filename:
+                activity_prefix = filename.split('_')[0]
+                mode = activity_prefix.capitalize()  # walking -> Walking, biking -> Biking, etc.
+            
+            # Format date/time for paths and frontmatter
+            pub_date = dt.strftime('%Y-%m-%d')
+            ym_path = dt.strftime('%Y/%m')
+            title = f"{dt.strftime('%a %b %d')} at {dt.strftime('%-l%p').lower()} - {mode} {place}"
+            weight = f"-{dt.strftime('%Y%m%d%H%M')}"
+            
+            # Create markdown file
+            md_filename = filename.removesuffix('.gpx') + '.md'
+            md_dir = os.path.join(hikes_path, 'content/hikes', ym_path)
+            os.makedirs(md_dir, exist_ok=True)
+            
+            md_path = os.path.join(md_dir, md_filename)
+            
+            md_content = (
+                # Frontmatter
+                "---\n"
+                f"title: {title}\n"
+                f"weight: {weight}\n"
+                f"publishDate: {pub_date}\n"
+                f"location: {place}\n"
+                "highlight: false\n"
+                f"bike: {'True' if mode in ['Biking', 'Cycling'] else 'False'}\n"
+                f"trackType: {mode.lower()}\n"
+                "trashBags: false\n"
+                "trashRecyclables: false\n"
+                "trashWeight: false\n"
+                "weather: Weather data not available\n"
+                "---\n"
+                # Leaflet map shortcodes
+                '{{< leaflet-map mapHeight="500px" mapWidth="100%" >}}\n'
+                f'  {{{{< leaflet-track trackPath="{ym_path}/{filename}" lineColor=#c838d1 lineWeight="5" graphDetached=True >}}}}\n'
+                '{{< /leaflet-map >}}\n'
+            )
+            with open(md_path, 'w') as md_file:
+                md_file.write(md_content)
+            
+            # Copy GPX file to static directory
+            gpx_dir = os.path.join(hikes_path, 'static/gpx', ym_path)
+            os.makedirs(gpx_dir, exist_ok=True)
+            shutil.copyfile(file_path, os.path.join(gpx_dir, filename))
+            
+            logger.info(f"Posted {filename} to Hikes")
+            return True
+            
+        except Exception as ex:
+            logger.error(f"Error posting {filename}: {ex}")
+            return False
+    
     def post_to_hikes(self, e):
         """Post selected routes to Hikes blog repository"""
         if not self.selected_files:
@@ -1363,110 +2122,65 @@ Note: The workout-routes folder contains individual .gpx files for each recorded
             self.update_status(f"Error: Hikes repository not found at {hikes_path}")
             return
         
-        posted_count = 0
+        self.update_status(f"📤 Posting {len(self.selected_files)} route(s) to Hikes...")
         
-        for filename in self.selected_files:
-            file_path = os.path.join(self.temp_dir, filename)
-            
-            try:
-                # Parse GPX file
-                gpx = self.processor.parse_gpx(file_path)
-                if not gpx:
-                    logger.error(f"Could not parse {filename}")
-                    continue
-                
-                # Extract GPX metadata
-                center = self.get_track_center(gpx)
-                dt = self.get_datetime(gpx)
-                
-                if not dt:
-                    logger.error(f"No datetime found in {filename}")
-                    continue
-                
-                place = self.identify_place(center[0], center[1])
-                
-                # Extract activity type from filename (e.g., walking_2025-10-10_2.40pm.gpx)
-                mode = "Walking"  # Default mode
-                if '_' in filename:
-                    activity_prefix = filename.split('_')[0]
-                    mode = activity_prefix.capitalize()  # walking -> Walking, biking -> Biking, etc.
-                
-                # Format date/time for paths and frontmatter
-                pub_date = dt.strftime('%Y-%m-%d')
-                ym_path = dt.strftime('%Y/%m')
-                title = f"{dt.strftime('%a %b %d')} at {dt.strftime('%-l%p').lower()} - {mode} {place}"
-                weight = f"-{dt.strftime('%Y%m%d%H%M')}"
-                
-                # Create markdown file
-                md_filename = filename.replace('.gpx', '.md')
-                md_dir = os.path.join(hikes_path, 'content/hikes', ym_path)
-                os.makedirs(md_dir, exist_ok=True)
-                
-                md_path = os.path.join(md_dir, md_filename)
-                
-                with open(md_path, 'w') as md_file:
-                    # Write frontmatter
-                    md_file.write("---\n")
-                    md_file.write(f"title: {title}\n")
-                    md_file.write(f"weight: {weight}\n")
-                    md_file.write(f"publishDate: {pub_date}\n")
-                    md_file.write(f"location: {place}\n")
-                    md_file.write("highlight: false\n")
-                    md_file.write(f"bike: {'True' if mode in ['Biking', 'Cycling'] else 'False'}\n")
-                    md_file.write(f"trackType: {mode.lower()}\n")
-                    md_file.write("trashBags: false\n")
-                    md_file.write("trashRecyclables: false\n")
-                    md_file.write("trashWeight: false\n")
-                    md_file.write("weather: Weather data not available\n")
-                    md_file.write("---\n")
-                    
-                    # Write leaflet map shortcodes
-                    md_file.write('{{< leaflet-map mapHeight="500px" mapWidth="100%" >}}\n')
-                    md_file.write(f'  {{{{< leaflet-track trackPath="{ym_path}/{filename}" lineColor=#c838d1 lineWeight="5" graphDetached=True >}}}}\n')
-                    md_file.write('{{< /leaflet-map >}}\n')
-                
-                # Copy GPX file to static directory
-                gpx_dir = os.path.join(hikes_path, 'static/gpx', ym_path)
-                os.makedirs(gpx_dir, exist_ok=True)
-                shutil.copy(file_path, os.path.join(gpx_dir, filename))
-                
-                posted_count += 1
-                logger.info(f"Posted {filename} to Hikes")
-                
-            except Exception as ex:
-                logger.error(f"Error posting {filename}: {ex}")
+        # Parsing holds the GIL, so uncached routes are parsed across processes before the threads start
+        self.processor.prefetch_gpx_arrays([self._temp_prefix + filename for filename in self.selected_files])
+        
+        # Each route is independent and mostly waits on reverse geocoding, so post them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            posted_count = sum(executor.map(self._post_route_to_hikes, sorted(self.selected_files), repeat(hikes_path)))
         
         # Git commit and push
         if posted_count > 0:
             try:
                 import subprocess
-                cwd = os.getcwd()
-                os.chdir(hikes_path)
                 
-                subprocess.run(['git', 'pull'], check=True)
-                subprocess.run(['git', 'add', '.'], check=True)
-                subprocess.run(['git', 'commit', '-m', f'Posted {posted_count} routes from GPX Routes Workbench'], check=True)
-                subprocess.run(['git', 'push'], check=True)
+                # Run git inside the hikes repository without changing the process-wide working
+                # directory, which other handler threads rely on for relative paths
+                subprocess.run(['git', 'pull'], cwd=hikes_path, check=True)
+                subprocess.run(['git', 'add', '.'], cwd=hikes_path, check=True)
+                subprocess.run(['git', 'commit', '-m', f'Posted {posted_count} routes from GPX Routes Workbench'],
+                               cwd=hikes_path, check=True)
+                subprocess.run(['git', 'push'], cwd=hikes_path, check=True)
                 
-                os.chdir(cwd)
                 self.update_status(f"Successfully posted {posted_count} route(s) to Hikes and pushed to GitHub")
                 
             except subprocess.CalledProcessError as e:
                 logger.error(f"Git error: {e}")
-                os.chdir(cwd)
                 self.update_status(f"Posted {posted_count} file(s) but git push failed")
             except Exception as e:
                 logger.error(f"Error during git operations: {e}")
-                os.chdir(cwd)
                 self.update_status(f"Posted {posted_count} file(s) but git operations failed")
         else:
             self.update_status("No files were posted")
     
-    def update_status(self, message: str):
-        """Update status text"""
+    def update_status(self, message: str, refresh_page: bool = True):
+        """Update status text
+        The page is refreshed at most every 50 ms; a skipped refresh is sent by a trailing flush, so the
+        last message of a burst is always shown. Callers that update the page themselves right
+        afterwards pass refresh_page=False."""
         self.status_text.value = f"{datetime.now().strftime('%H:%M:%S')} - {message}"
-        self.page.update()
+        if refresh_page:
+            with self._status_lock:
+                now = time.monotonic()
+                wait = self._last_status_update + 0.05 - now
+                if wait <= 0:
+                    self._last_status_update = now
+                elif self._status_flush is None:
+                    self._status_flush = threading.Timer(wait, self._flush_status)
+                    self._status_flush.daemon = True
+                    self._status_flush.start()
+            if wait <= 0:
+                self.page.update()
         logger.info(message)
+    
+    def _flush_status(self):
+        """Send a status text whose page refresh update_status held back"""
+        with self._status_lock:
+            self._status_flush = None
+            self._last_status_update = time.monotonic()
+        self.page.update()
 
 
 def main(page: ft.Page):
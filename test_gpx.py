@@ -11,6 +11,29 @@ sys.path.insert(0, '/home/runner/work/gpx-routes-workbench-using-flet/gpx-routes
 
 from main import GPXProcessor, PersistentData
 import shutil
+import tempfile
+import numpy as np
+
+
+def _write_track(path, segments, tagged=False):
+    """Write a GPX 1.1 file with one point per second; segments are lists of latitude steps
+    tagged adds Apple Health style speed and distance-to-next extensions to every point."""
+    extensions = "<extensions><speed>1.0</speed><distance-to-next>1.0</distance-to-next></extensions>"
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1"><trk>']
+    second, lat = 0, 41.0
+    for steps in segments:
+        lines.append('<trkseg>')
+        for step in steps:
+            lat += step
+            lines.append(f'<trkpt lat="{lat:.7f}" lon="-93.0000000"><ele>300.0</ele>'
+                         f'<time>2025-10-10T19:{second // 60:02d}:{second % 60:02d}Z</time>'
+                         f'{extensions if tagged else ""}</trkpt>')
+            second += 1
+        lines.append('</trkseg>')
+    lines.append('</trk></gpx>')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
 
 def test_persistent_data():
     """Test persistent data management"""
@@ -77,6 +100,149 @@ def test_gpx_processor():
     print("✅ All GPX Processor tests passed")
 
 
+# Apple Health route export: default GPX 1.1 namespace, per-point extensions without distance-to-next
+_APPLE_STYLE_GPX = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="Apple Health Export" xmlns="http://www.topografix.com/GPX/1/1"
+     xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+<metadata><time>2025-10-10T19:45:00Z</time></metadata>
+<trk><name>Route 2025-10-10 2:40pm</name><trkseg>
+<trkpt lat="41.9210000" lon="-93.3470000"><ele>300.5</ele><time>2025-10-10T19:40:23Z</time>
+<extensions><speed>1.2</speed><course>90.0</course><hAcc>2.1</hAcc><vAcc>1.5</vAcc></extensions></trkpt>
+<trkpt lat="41.9210100" lon="-93.3470100"><time>2025-10-10T19:40:24Z</time>
+<extensions><speed>1.3</speed><course>91.0</course><hAcc>2.0</hAcc><vAcc>1.4</vAcc></extensions></trkpt>
+<trkpt lat="41.9210200" lon="-93.3470200"><ele>300.9</ele>
+<extensions><speed>1.1</speed><course>92.0</course><hAcc>2.2</hAcc><vAcc>1.6</vAcc></extensions></trkpt>
+</trkseg><trkseg>
+<trkpt lat="41.9220000" lon="-93.3480000"><ele>301.0</ele><time>2025-10-10T19:50:00Z</time>
+<extensions><speed>1.4</speed><course>93.0</course><hAcc>2.3</hAcc><vAcc>1.7</vAcc></extensions></trkpt>
+<trkpt lat="41.9220100" lon="-93.3480100"><ele>301.2</ele><time>2025-10-10T19:50:01Z</time>
+<extensions><speed>1.5</speed><course>94.0</course><hAcc>2.4</hAcc><vAcc>1.8</vAcc></extensions></trkpt>
+</trkseg></trk>
+</gpx>
+"""
+
+
+def test_gpx_arrays():
+    """Test the streaming array parser and its .npz cache"""
+    print("\nTesting GPX arrays...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        apple_path = os.path.join(temp_dir, "apple.gpx")
+        with open(apple_path, 'w') as f:
+            f.write(_APPLE_STYLE_GPX)
+        
+        # Same points as gpxpy, NaN where <ele> or <time> is missing, segments ending at 3 and 5
+        arrays = GPXProcessor.parse_gpx_arrays(apple_path)
+        points = [point for track in GPXProcessor.parse_gpx(apple_path).tracks
+                  for segment in track.segments for point in segment.points]
+        assert arrays['segment_ends'].tolist() == [3, 5]
+        assert arrays['lat'].tolist() == [point.latitude for point in points]
+        assert arrays['lon'].tolist() == [point.longitude for point in points]
+        assert np.allclose(arrays['ele'], [np.nan if p.elevation is None else p.elevation for p in points],
+                           equal_nan=True)
+        assert np.array_equal(arrays['time'], [np.nan if p.time is None else p.time.timestamp() for p in points],
+                              equal_nan=True)
+        assert np.allclose(arrays['speed'], [1.2, 1.3, 1.1, 1.4, 1.5])
+        assert np.isnan(arrays['distance']).all()
+        print("✅ Array parser matches gpxpy")
+        
+        # Tag detection agrees with the gpxpy version on untagged, Apple (speed only) and tagged files
+        plain_path = os.path.join(temp_dir, "plain.gpx")
+        tagged_path = os.path.join(temp_dir, "tagged.gpx")
+        _write_track(plain_path, [[0.00001] * 5])
+        _write_track(tagged_path, [[0.00001] * 5, [0.00001] * 3], tagged=True)
+        for path, expected in ((plain_path, False), (apple_path, False), (tagged_path, True)):
+            assert GPXProcessor.has_speed_and_distance_tags(GPXProcessor.parse_gpx(path)) is expected
+            assert GPXProcessor.has_array_speed_and_distance_tags(GPXProcessor.parse_gpx_arrays(path)) is expected
+        print("✅ Array tag detection matches gpxpy")
+        
+        # A rewritten file is parsed again instead of being served from its stale .npz
+        assert len(GPXProcessor.get_gpx_arrays(plain_path)['lat']) == 5
+        assert os.path.exists(GPXProcessor._array_cache_path(plain_path))
+        _write_track(plain_path, [[0.00001] * 7])
+        GPXProcessor.clear_array_cache()
+        assert len(GPXProcessor.get_gpx_arrays(plain_path)['lat']) == 7
+        with np.load(GPXProcessor._array_cache_path(plain_path)) as cached:
+            assert int(cached['source_size']) == os.path.getsize(plain_path)
+        print("✅ Stale .npz cache is replaced")
+    finally:
+        GPXProcessor.clear_array_cache()
+        shutil.rmtree(temp_dir)
+
+
+def test_trim():
+    """Test speed trimming of point masks and files"""
+    print("\nTesting speed trimming...")
+    
+    # 4 consecutive high-speed points are dropped on their own
+    speeds = np.array([np.nan, 1, 1, 1, 1, 1, 9, 9, 9, 9, 1, 1])
+    keep = GPXProcessor._trim_keep_mask(speeds, 5.0)
+    assert keep.tolist() == [True] * 6 + [False] * 4 + [True] * 2
+    
+    # The 5th drops the 4 previously kept points and the rest of the segment
+    speeds = np.array([np.nan, 1, 1, 1, 1, 1, 9, 9, 9, 9, 9, 1])
+    keep = GPXProcessor._trim_keep_mask(speeds, 5.0)
+    assert keep.tolist() == [True] * 2 + [False] * 10
+    print("✅ 5-consecutive boundary works")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # About 1 m/s throughout: nothing to trim, so the file is left untouched
+        slow_path = os.path.join(temp_dir, "slow.gpx")
+        _write_track(slow_path, [[0.00001] * 20], tagged=True)
+        before = os.stat(slow_path).st_mtime_ns, open(slow_path).read()
+        assert GPXProcessor.process(slow_path, max_speed=10.0)
+        assert (os.stat(slow_path).st_mtime_ns, open(slow_path).read()) == before
+        print("✅ File with nothing to trim is left unchanged")
+        
+        # Already tagged GPX 1.1 file (gpxpy does not load its speeds) with a 6-point run at ~110 m/s
+        fast_path = os.path.join(temp_dir, "fast.gpx")
+        _write_track(fast_path, [[0.00001] * 10 + [0.001] * 6 + [0.00001] * 4], tagged=True)
+        assert GPXProcessor.process(fast_path, max_speed=10.0)
+        arrays = GPXProcessor.parse_gpx_arrays(fast_path)
+        assert len(arrays['lat']) == 6
+        print("✅ Tagged GPX 1.1 file is trimmed")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_array_exceeds_speed():
+    """Test the streaming speed screen used before trimming"""
+    print("\nTesting array speed screen...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "route.gpx")
+        _write_track(path, [[0.00001] * 10, [0.00002] * 10])
+        arrays = GPXProcessor.parse_gpx_arrays(path)
+        # The file is untagged, so speeds come from the points as _array_exceeds_speed computes them
+        fastest = max(
+            float(np.nanmax(GPXProcessor._distances_and_speeds(
+                arrays['lat'][segment], arrays['lon'][segment],
+                arrays['ele'][segment].astype(np.float64), arrays['time'][segment])[1]))
+            for segment in (slice(0, 10), slice(10, 20)))
+        
+        # Threshold boundary: padding for float32 elevations is far below 1 mm/s here
+        assert GPXProcessor._array_exceeds_speed(arrays, fastest - 1e-3)
+        assert not GPXProcessor._array_exceeds_speed(arrays, fastest + 1e-3)
+        print("✅ Speed screen threshold boundary works")
+        
+        # A fast first segment answers without computing the second one
+        calls = []
+        distances_and_speeds = GPXProcessor._distances_and_speeds
+        GPXProcessor._distances_and_speeds = staticmethod(
+            lambda *segment: calls.append(segment) or distances_and_speeds(*segment))
+        try:
+            assert GPXProcessor._array_exceeds_speed(arrays, 0.5)
+        finally:
+            GPXProcessor._distances_and_speeds = staticmethod(distances_and_speeds)
+        assert len(calls) == 1
+        print("✅ Speed screen exits early")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
 def test_temp_directory():
     """Test temp directory creation"""
     print("\nTesting temp directory...")
@@ -100,6 +266,9 @@ if __name__ == "__main__":
     try:
         test_persistent_data()
         test_gpx_processor()
+        test_gpx_arrays()
+        test_trim()
+        test_array_exceeds_speed()
         test_temp_directory()
         
         print("\n" + "=" * 50)